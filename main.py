@@ -1,25 +1,54 @@
+import asyncio
+import importlib
+import os
+import struct
 import sys
-import subprocess
 from pathlib import Path
 
-from PyQt6.QtCore import Qt, QPropertyAnimation, QEasingCurve
-from PyQt6.QtGui import QFont, QPalette, QColor
+import qasync
+from qasync import asyncSlot
+from PyQt6.QtCore import (
+    Qt,
+    QPropertyAnimation,
+    QEasingCurve,
+    QThreadPool,
+)
+from PyQt6.QtGui import (
+    QFont,
+    QPalette,
+    QColor,
+    QTextCharFormat,
+    QTextCursor,
+    QTextOption,
+)
 from PyQt6.QtWidgets import (
     QApplication,
+    QCheckBox,
+    QDialog,
     QFileDialog,
     QHBoxLayout,
     QLabel,
     QLineEdit,
     QMainWindow,
     QMessageBox,
+    QProgressDialog,
     QPushButton,
     QInputDialog,
-    QTextEdit,
+    QPlainTextEdit,
+    QTabWidget,
     QVBoxLayout,
     QWidget,
     QGraphicsDropShadowEffect,
 )
-from llama_cpp import Llama
+# llama_cpp is imported lazily (see MainWindow._load_model): pulling in
+# the native library at startup delays the first window paint by seconds
+
+MODULE_DIR = Path(__file__).resolve().parent
+QUANT_BIN = (
+    MODULE_DIR
+    / "llama_app"
+    / ("llama-quantize.exe" if sys.platform.startswith("win") else "llama-quantize")
+).resolve()
 
 GOLD = "#d4af37"
 BG_DARK = "#111318"
@@ -28,6 +57,138 @@ TEXT_PLACEHOLDER = "#e5e5e5"
 BG_TOP = "#14161c"
 BG_BOTTOM = "#0e0f13"
 
+# Flushing every token makes the chat log re-layout constantly;
+# a few tokens per flush keeps the stream smooth and cheap
+FLUSH_EVERY = 4
+
+# Candidate replies in drafts mode. The high-level API has no batched
+# decode, so the drafts generate sequentially; the prompt cache at least
+# amortizes their shared prefill
+N_DRAFTS = 4
+
+# Rough quantized-output size as a fraction of an FP16 source GGUF,
+# in the order the quantize dialog lists them (largest first)
+QTYPE_RATIOS = {"Q4_K_M": 0.6, "Q3_K_S": 0.45, "Q2_K": 0.35}
+
+# Cap the chat log so a long session doesn't grow the document
+# (and its re-layout cost) without bound
+MAX_LOG_BLOCKS = 1000
+
+
+def detect_performance_cores():
+    """
+    Set of P-core ids on hybrid CPUs (Linux exposes them via sysfs);
+    None when the topology is flat or unknown
+    """
+    try:
+        text = Path("/sys/devices/cpu_core/cpus").read_text().strip()
+    except OSError:
+        return None
+    cores = set()
+    for part in text.split(","):
+        if "-" in part:
+            lo, hi = part.split("-")
+            cores.update(range(int(lo), int(hi) + 1))
+        elif part:
+            cores.add(int(part))
+    return cores or None
+
+
+PCORES = detect_performance_cores()
+
+
+def pin_to_performance_cores():
+    """
+    Helper. Pin the calling thread to the P-cores on hybrid CPUs
+    """
+    if PCORES and hasattr(os, "sched_setaffinity"):
+        try:
+            os.sched_setaffinity(0, PCORES)
+        except OSError:
+            pass
+
+
+def detect_free_vram():
+    """
+    Best-effort probe of free VRAM in bytes; None when no GPU or probe
+    library is available
+    """
+    try:
+        import pynvml
+
+        pynvml.nvmlInit()
+        try:
+            handle = pynvml.nvmlDeviceGetHandleByIndex(0)
+            return pynvml.nvmlDeviceGetMemoryInfo(handle).free
+        finally:
+            pynvml.nvmlShutdown()
+    except Exception:
+        pass
+    try:
+        import torch
+
+        if torch.cuda.is_available():
+            return torch.cuda.mem_get_info()[0]
+    except Exception:
+        pass
+    return None
+
+
+def make_format(color: str, bold: bool = False) -> QTextCharFormat:
+    """
+    Helper. Build a character format for the plain-text chat log
+    """
+    fmt = QTextCharFormat()
+    fmt.setForeground(QColor(color))
+    if bold:
+        fmt.setFontWeight(QFont.Weight.Bold)
+    return fmt
+
+
+GGUF_MAGIC = 0x46554747  # b"GGUF" little-endian
+# GGUF metadata value type -> size in bytes (fixed-size types only)
+GGUF_SCALAR_SIZES = {0: 1, 1: 1, 2: 2, 3: 2, 4: 4, 5: 4, 6: 4, 7: 1, 10: 8, 11: 8, 12: 8}
+
+
+def gguf_file_type(path: Path):
+    """
+    Read general.file_type from a GGUF header without loading the model.
+    Returns None if the file is not GGUF or the key is missing.
+    """
+
+    def read(f, fmt):
+        return struct.unpack(fmt, f.read(struct.calcsize(fmt)))
+
+    try:
+        with path.open("rb") as f:
+            magic, version, _tensor_count, kv_count = read(f, "<IIQQ")
+            if magic != GGUF_MAGIC or version < 2:
+                return None
+            for _ in range(kv_count):
+                (klen,) = read(f, "<Q")
+                key = f.read(klen)
+                (vtype,) = read(f, "<I")
+                if key == b"general.file_type" and vtype == 4:
+                    return read(f, "<I")[0]
+                if vtype in GGUF_SCALAR_SIZES:
+                    f.seek(GGUF_SCALAR_SIZES[vtype], 1)
+                elif vtype == 8:  # string
+                    (n,) = read(f, "<Q")
+                    f.seek(n, 1)
+                elif vtype == 9:  # array
+                    etype, n = read(f, "<IQ")
+                    if etype == 8:
+                        for _ in range(n):
+                            (m,) = read(f, "<Q")
+                            f.seek(m, 1)
+                    else:
+                        f.seek(GGUF_SCALAR_SIZES[etype] * n, 1)
+                else:
+                    return None
+    except (OSError, KeyError, struct.error):
+        return None
+    return None
+
 
 def add_shadow(
     widget: QWidget,
@@ -57,6 +218,14 @@ class ChatWindow(QWidget):
         self.resize(740, 520)
         self.model_loader = model_loader
         self._llama = None
+        self._busy = False
+        self._messages: list[dict] = []
+        self._response_parts: list[str] = []
+
+        self._fmt_user = make_format(GOLD, bold=True)
+        self._fmt_llm = make_format(TEXT_PLACEHOLDER, bold=True)
+        self._fmt_text = make_format(TEXT_PLACEHOLDER)
+        self._fmt_err = make_format("#e74c3c")
 
         font = QFont("Poppins", 11)
         self.setFont(font)
@@ -67,7 +236,16 @@ class ChatWindow(QWidget):
         pal.setColor(QPalette.ColorRole.Text, Qt.GlobalColor.white)
         self.setPalette(pal)
 
-        self.display = QTextEdit(readOnly=True)
+        # QPlainTextEdit lays out line-by-line instead of running the
+        # full rich-text engine — much cheaper per append for a log
+        self.display = QPlainTextEdit(readOnly=True)
+        self.display.setUndoRedoEnabled(False)
+        self.display.setMaximumBlockCount(MAX_LOG_BLOCKS)
+        # Break unbroken runs (long URLs, token soup) instead of letting
+        # the layout engine search for a word boundary that isn't there
+        self.display.setWordWrapMode(
+            QTextOption.WrapMode.WrapAtWordBoundaryOrAnywhere
+        )
         self.display.setStyleSheet(
             f"background: {BG_PANEL}; border: none; border-radius: 12px; padding: 12px;"
         )
@@ -95,8 +273,15 @@ class ChatWindow(QWidget):
         self.send_btn.setMinimumHeight(44)
         self._stylize_button(self.send_btn)
 
+        self.drafts_check = QCheckBox("4 варианта")
+        self.drafts_check.setToolTip(
+            "Сгенерировать несколько вариантов ответа и выбрать лучший"
+        )
+        self.drafts_check.setStyleSheet(f"color: {TEXT_PLACEHOLDER};")
+
         input_row = QHBoxLayout()
         input_row.addWidget(self.input_line, 1)
+        input_row.addWidget(self.drafts_check)
         input_row.addWidget(self.send_btn)
 
         layout = QVBoxLayout(self)
@@ -108,7 +293,10 @@ class ChatWindow(QWidget):
         self.input_line.returnPressed.connect(self._on_send)
         self.send_btn.clicked.connect(self._on_send)
 
-        add_shadow(self.display, 40, 0, 6, 0.35)
+        # No shadow on the chat view: a QGraphicsDropShadowEffect re-renders
+        # the widget offscreen and re-blurs it on every repaint, i.e. on
+        # every streamed token. Buttons only repaint on hover, so their
+        # shadows stay.
         add_shadow(self.send_btn, 40, 0, 4, 0.5)
 
     def _stylize_button(self, btn: QPushButton):
@@ -135,32 +323,147 @@ class ChatWindow(QWidget):
         if self._llama is None:
             self._llama = self.model_loader()
 
-    def _on_send(self):
+    @asyncSlot()
+    async def _on_send(self):
         """
         Handle sending user input to the model and displaying the response
         """
+        if self._busy:
+            return
         user_text = self.input_line.text().strip()
         if not user_text:
             return
         self.input_line.clear()
-        self.display.append(
-            f"<span style='color:{GOLD};'><b>Вы:</b></span> "
-            f"<span style='color:{TEXT_PLACEHOLDER};'>{user_text}</span>"
-        )
+        self._append_text("Вы: ", self._fmt_user)
+        self._append_text(user_text + "\n", self._fmt_text)
+        self._busy = True
+        self.send_btn.setEnabled(False)
+        # The full history rides along each turn; the model's prompt
+        # cache resumes from the shared prefix instead of re-evaluating
+        self._messages.append({"role": "user", "content": user_text})
+        self._response_parts = []
+        messages = list(self._messages)
         try:
-            self._ensure_model()
-            response = self._llama(user_text, max_tokens=256, temperature=0.7)[
-                "choices"
-            ][0]["text"].strip()
+            # Generation stays blocking llama_cpp code, but it runs on a
+            # worker thread and the shared qasync loop keeps painting
+            await asyncio.to_thread(self._ensure_model)
+            if self.drafts_check.isChecked():
+                drafts = await asyncio.to_thread(self._generate_drafts, messages)
+                self._on_drafts(drafts)
+            else:
+                self._append_text("LLM: ", self._fmt_llm)
+                loop = asyncio.get_running_loop()
+                await asyncio.to_thread(self._generate_stream, loop, messages)
+                self._on_finished()
         except Exception as exc:
-            response = f"<span style='color:#e74c3c'>[Ошибка] {exc}</span>"
+            self._on_error(str(exc))
+
+    def _generate_stream(self, loop: asyncio.AbstractEventLoop, messages: list):
+        """
+        Blocking streamed generation; runs inside asyncio.to_thread and
+        posts token chunks back to the GUI thread via the loop
+        """
+        pin_to_performance_cores()
+        buffer = []
+        for chunk in self._llama.create_chat_completion(
+            messages, max_tokens=256, temperature=0.7, stream=True
+        ):
+            token = chunk["choices"][0]["delta"].get("content")
+            if not token:
+                continue
+            buffer.append(token)
+            if len(buffer) >= FLUSH_EVERY:
+                loop.call_soon_threadsafe(self._on_token, "".join(buffer))
+                buffer.clear()
+        if buffer:
+            loop.call_soon_threadsafe(self._on_token, "".join(buffer))
+
+    def _generate_drafts(self, messages: list) -> list:
+        """
+        Blocking generation of several candidate replies; runs inside
+        asyncio.to_thread
+        """
+        pin_to_performance_cores()
+        drafts = []
+        for _ in range(N_DRAFTS):
+            result = self._llama.create_chat_completion(
+                messages, max_tokens=256, temperature=0.7
+            )
+            drafts.append(result["choices"][0]["message"]["content"].strip())
+        return drafts
+
+    def _append_text(self, text: str, fmt: QTextCharFormat):
+        """
+        Insert styled text at the end of the chat log
+        """
+        cursor = self.display.textCursor()
+        cursor.movePosition(QTextCursor.MoveOperation.End)
+        cursor.insertText(text, fmt)
 
-        self.display.append(
-            f"<span style='color:{TEXT_PLACEHOLDER};'><b>LLM:</b></span> "
-            f"<span style='color:{TEXT_PLACEHOLDER};'>{response}</span><br><br>"
+    def _on_token(self, text: str):
+        """
+        Append a streamed token chunk to the end of the chat log
+        """
+        self._response_parts.append(text)
+        self._append_text(text, self._fmt_text)
+        sb = self.display.verticalScrollBar()
+        sb.setValue(sb.maximum())
+
+    def _on_finished(self):
+        """
+        Close out a streamed response and unlock the send button
+        """
+        self._messages.append(
+            {"role": "assistant", "content": "".join(self._response_parts)}
         )
+        self._append_text("\n\n", self._fmt_text)
+        self._finish_turn()
+
+    def _on_drafts(self, drafts: list):
+        """
+        Show the candidate replies in tabs and keep the one the user picks
+        """
+        dialog = QDialog(self)
+        dialog.setWindowTitle("Варианты ответа")
+        dialog.resize(640, 420)
+        tabs = QTabWidget()
+        for i, text in enumerate(drafts, 1):
+            view = QPlainTextEdit(readOnly=True)
+            view.setPlainText(text)
+            tabs.addTab(view, f"Вариант {i}")
+        pick_btn = QPushButton("Выбрать")
+        pick_btn.clicked.connect(dialog.accept)
+        vbox = QVBoxLayout(dialog)
+        vbox.addWidget(tabs, 1)
+        vbox.addWidget(pick_btn)
+        if dialog.exec() != QDialog.DialogCode.Accepted or not drafts:
+            # Dismissed (Esc / window close): drop the unanswered turn so
+            # the discarded drafts can't leak into the model's context
+            self._messages.pop()
+            self._finish_turn()
+            return
+
+        choice = drafts[tabs.currentIndex()]
+        self._messages.append({"role": "assistant", "content": choice})
+        self._append_text("LLM: ", self._fmt_llm)
+        self._append_text(choice + "\n\n", self._fmt_text)
+        self._finish_turn()
+
+    def _on_error(self, message: str):
+        """
+        Display an inference error and unlock the send button
+        """
+        self._append_text(f"[Ошибка] {message}\n\n", self._fmt_err)
+        self._finish_turn()
+
+    def _finish_turn(self):
+        """
+        Scroll the log down and re-enable input after a turn completes
+        """
         sb = self.display.verticalScrollBar()
         sb.setValue(sb.maximum())
+        self._busy = False
+        self.send_btn.setEnabled(True)
 
 
 class MainWindow(QMainWindow):
@@ -173,6 +476,14 @@ class MainWindow(QMainWindow):
         self.setWindowTitle("LLaMA Launcher")
         self.resize(520, 420)
         self.setMinimumSize(420, 360)
+        self._llama_cache: "dict[Path, Llama]" = {}
+        self._busy = False
+
+        # Warm the native library in the background so the first model
+        # load doesn't also pay the import cost; the window paints first
+        QThreadPool.globalInstance().start(
+            lambda: importlib.import_module("llama_cpp")
+        )
 
         self.setFont(QFont("Poppins", 12))
 
@@ -240,14 +551,34 @@ class MainWindow(QMainWindow):
             """
         )
 
-    def _choose_and_load(self):
+    @asyncSlot()
+    async def _choose_and_load(self):
         """
         Open file dialog to select GGUF model and load it
         """
+        # Async slot: the window stays interactive during quantize/load,
+        # so guard against a second click re-entering the flow
+        if self._busy:
+            return
+        self._busy = True
+        try:
+            await self._choose_and_load_inner()
+        finally:
+            self._busy = False
+
+    async def _choose_and_load_inner(self):
         filters = "GGUF / GGML Models (*.gguf *.ggml);;All files (*)"
-        start_dir = str(Path(__file__).resolve().parent)
+        start_dir = str(MODULE_DIR)
+        # Qt's own dialog: the native Win32 one spins up a COM apartment
+        # and enumerates network locations, adding up to seconds of stall
+        # for what is always a local .gguf pick
         file_path, _ = QFileDialog.getOpenFileName(
-            self, "Выберите модель", start_dir, filters
+            self,
+            "Выберите модель",
+            start_dir,
+            filters,
+            options=QFileDialog.Option.DontUseNativeDialog
+            | QFileDialog.Option.ReadOnly,
         )
         if not file_path:
             return
@@ -266,59 +597,113 @@ class MainWindow(QMainWindow):
                 "Метод квантования",
                 "Выберите степень квантования:",
                 ["Q4_K_M (баланс)", "Q3_K_S (ещё компактнее)", "Q2_K (макс. сжатие)"],
-                0,
+                self._suggest_qtype_index(self.model_path),
                 False,
             )
             if not ok:
                 return
             qtype = qtype.split()[0]
             try:
-                self.model_path = self._quantize_model(self.model_path, qtype)
+                self.model_path = await self._quantize_model(self.model_path, qtype)
             except Exception as e:
                 QMessageBox.critical(self, "Ошибка квантования", str(e))
                 return
         try:
-            self._load_model()
+            await asyncio.to_thread(self._load_model)
             QMessageBox.information(self, "Готово", "Модель успешно загружена!")
         except Exception as exc:
             QMessageBox.critical(self, "Ошибка", str(exc))
 
-    def _quantize_model(self, src: Path, qtype: str = "Q4_K_M") -> Path:
+    def _suggest_qtype_index(self, src: Path) -> int:
+        """
+        Preselect the largest quant whose projected size fits in free VRAM
+        """
+        free_vram = detect_free_vram()
+        if not free_vram:
+            return 0
+        src_bytes = src.stat().st_size
+        for i, ratio in enumerate(QTYPE_RATIOS.values()):
+            if src_bytes * ratio <= 0.9 * free_vram:
+                return i
+        # Nothing fits; the smallest quant at least minimizes spill
+        return len(QTYPE_RATIOS) - 1
+
+    async def _quantize_model(self, src: Path, qtype: str = "Q4_K_M") -> Path:
         """
         Конвертирует GGUF-файл в указанный формат (qtype) с помощью утилиты
         quantize из llama.cpp.  Повторно не квантует, если файл уже есть.
         """
-        if ".Q" in src.stem:
-            raise RuntimeError(
-                f"Файл {src.name} уже содержит квантовку; повторное "
-                "квантование не поддерживается.\n"
-                "Скачайте FP16-версию модели (.gguf без Q-суффикса)."
-            )
-
-        dst = src.with_name(f"{src.stem}.{qtype}.gguf")
-        if dst.exists():
-            return dst
         dst = src.with_name(f"{src.stem}.{qtype}.gguf")
-        if dst.exists():
+        # Quantize is a minutes-long CPU job; reuse the output unless the
+        # source file changed since it was produced
+        if dst.exists() and dst.stat().st_mtime >= src.stat().st_mtime:
             return dst
 
-        quant_bin = (
-            Path(__file__).resolve().parent
-            / "llama_app"
-            / (
-                "llama-quantize.exe"
-                if sys.platform.startswith("win")
-                else "llama-quantize"
+        # file_type 0/1 are F32/F16; anything above is already quantized.
+        # Read it from the GGUF header instead of guessing from the name
+        ftype = gguf_file_type(src)
+        allow_requantize = False
+        if ftype is not None and ftype > 1:
+            reply = QMessageBox.question(
+                self,
+                "Повторное квантование",
+                f"Файл {src.name} уже квантован. Квантовать повторно?\n"
+                "(качество может заметно упасть)",
+                QMessageBox.StandardButton.Yes | QMessageBox.StandardButton.No,
             )
-        ).resolve()
-
-        if not quant_bin.exists():
-            raise RuntimeError(f"Не найден quantize: {quant_bin}")
+            if reply != QMessageBox.StandardButton.Yes:
+                return src
+            allow_requantize = True
+
+        if not QUANT_BIN.exists():
+            raise RuntimeError(f"Не найден quantize: {QUANT_BIN}")
+
+        # The quantize run takes minutes on multi-GB models; an asyncio
+        # subprocess lets the shared Qt/asyncio loop keep painting while
+        # llama-quantize's per-tensor stderr output drives the progress
+        progress = QProgressDialog(f"Квантование в {qtype}…", "Отмена", 0, 0, self)
+        progress.setWindowTitle("Квантование")
+        progress.setWindowModality(Qt.WindowModality.WindowModal)
+        progress.setMinimumDuration(0)
+
+        # Quantization is parallel per-tensor; the tool defaults to a
+        # handful of threads, so pass the core count explicitly (the
+        # trailing positional argument in llama-quantize's CLI)
+        args = [str(src), str(dst), qtype, str(os.cpu_count() or 8)]
+        if allow_requantize:
+            args.insert(0, "--allow-requantize")
+        proc = await asyncio.create_subprocess_exec(
+            str(QUANT_BIN),
+            *args,
+            stdout=asyncio.subprocess.DEVNULL,
+            stderr=asyncio.subprocess.PIPE,
+        )
 
-        cmd = [str(quant_bin), str(src), str(dst), qtype]
-        result = subprocess.run(cmd, capture_output=True, text=True)
-        if result.returncode != 0:
-            raise RuntimeError(result.stderr.strip())
+        stderr_lines: list[str] = []
+        try:
+            while True:
+                line = await proc.stderr.readline()
+                if not line:
+                    break
+                text = line.decode(errors="replace").strip()
+                if text:
+                    stderr_lines.append(text)
+                    progress.setLabelText(text[-80:])
+                if progress.wasCanceled():
+                    raise RuntimeError("Квантование отменено.")
+            returncode = await proc.wait()
+        except BaseException:
+            proc.kill()
+            await proc.wait()
+            dst.unlink(missing_ok=True)
+            raise
+        finally:
+            progress.close()
+
+        if returncode != 0:
+            raise RuntimeError(
+                "\n".join(stderr_lines[-10:]) or "llama-quantize завершился с ошибкой"
+            )
 
         return dst
 
@@ -331,13 +716,56 @@ class MainWindow(QMainWindow):
 
     def _load_model(self):
         """
-        Load the model, or return existing instance if already loaded
+        Load the model, or return a cached instance for the same file
         """
-        if hasattr(self, "_llama") and self._llama is not None:
-            return self._llama
         if not hasattr(self, "model_path"):
             raise RuntimeError("Сначала выберите модель.")
-        self._llama = Llama(model_path=str(self.model_path))
+        import llama_cpp
+        from llama_cpp import Llama, LlamaRAMCache
+        from llama_cpp.llama_speculative import LlamaPromptLookupDecoding
+
+        # Keyed by resolved path so switching quantizations back and
+        # forth reuses the already-loaded context instead of reloading
+        key = self.model_path.resolve()
+        cached = self._llama_cache.get(key)
+        if cached is not None:
+            return cached
+        # On hybrid CPUs, pin to the P-cores before construction so the
+        # threadpool llama.cpp spawns here inherits the affinity and the
+        # hot KV-cache path stops bouncing across core clusters
+        pin_to_performance_cores()
+        # Defaults (4 threads, n_batch=512, n_ctx=512) leave most of the
+        # CPU idle and truncate long prompts; size them to the machine
+        n_threads = len(PCORES) if PCORES else min(os.cpu_count() or 8, 16)
+        # Decode is memory-bound; when llama_cpp is a CUDA/Metal build,
+        # offloading every layer to VRAM is the single largest speedup
+        n_gpu_layers = -1 if llama_cpp.llama_supports_gpu_offload() else 0
+        self._llama = Llama(
+            model_path=str(self.model_path),
+            n_gpu_layers=n_gpu_layers,
+            main_gpu=0,
+            n_threads=n_threads,
+            n_threads_batch=n_threads,
+            n_batch=2048,
+            n_ubatch=512,
+            n_ctx=4096,
+            use_mmap=True,
+            use_mlock=False,
+            # Q8_0 KV cache halves the bytes read per decode step and
+            # flash attention fuses the attention reads on top of that
+            type_k=llama_cpp.GGML_TYPE_Q8_0,
+            type_v=llama_cpp.GGML_TYPE_Q8_0,
+            flash_attn=True,
+            # Prompt-lookup speculation: propose n-grams already seen in
+            # the prompt and verify them in one forward pass — no second
+            # model to download, and chat replies reuse the history a lot
+            draft_model=LlamaPromptLookupDecoding(num_pred_tokens=5),
+        )
+        # Chat turns share the conversation as a common prefix; the RAM
+        # cache lets each new message resume from the saved KV state
+        # instead of re-evaluating the whole history
+        self._llama.set_cache(LlamaRAMCache(capacity_bytes=2 << 30))
+        self._llama_cache[key] = self._llama
         return self._llama
 
 
@@ -347,9 +775,14 @@ def main():
     """
     app = QApplication(sys.argv)
     app.setApplicationDisplayName("LLaMA GUI")
+    # One shared Qt/asyncio event loop: async slots can await worker
+    # threads and subprocesses without blocking the UI
+    loop = qasync.QEventLoop(app)
+    asyncio.set_event_loop(loop)
     window = MainWindow()
     window.show()
-    sys.exit(app.exec())
+    with loop:
+        loop.run_forever()
 
 
 if __name__ == "__main__":